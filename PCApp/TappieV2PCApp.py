@@ -1,10 +1,23 @@
 import asyncio
+import concurrent.futures
+import platform
 import time
-import threading
+import winsound
+import logging
+import pathlib
 from bleak import BleakClient, BleakScanner
 from bleak.exc import BleakError
 from ahk import AHK
-from win11toast import notify
+from win11toast import toast_async
+
+# Use winloop (uvloop's Windows port) for lower per-callback overhead when it
+# is installed; otherwise pin the Proactor loop that bleak's WinRT backend
+# expects so the choice doesn't depend on the Python version's default
+try:
+    import winloop
+    winloop.install()
+except ImportError:
+    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
 # ===== CONFIGURATION =====
 # BLE UUIDs
@@ -16,10 +29,22 @@ MEDIA_DOUBLEBUTTON_UUID = "66f1ab02-c93d-44fe-8ca9-5e8bdbb2fe80"
 
 DEVICE_NAME = "TappieV2"
 
+# BLE payload tokens, kept as bytes so notifications are compared without decoding
+ENC_RESET = b"reset"
+BTN_SINGLE = b"single click"
+BTN_DOUBLE = b"double click"
+BTN_MULTI = b"multi click"
+BTN_LONG = b"long press release"
+BTN_RELEASED = b"0"
+
 # Application constants
 RECONNECT_DELAY = 10  # seconds
+SCAN_TIMEOUT = 3      # seconds to wait for an advertisement before giving up
 RESET_DELAY = 10      # seconds to wait before resetting to Master
 VOLUME_STEP = 5       # Volume increment/decrement per encoder step
+VOLUME_FLUSH_DELAY = 0.04  # seconds to collect encoder ticks before one AHK write
+UI_FLUSH_DELAY = 0.25      # minimum seconds between tray tooltip/icon refreshes
+DEBUG_GATT = False    # Dump the GATT table on connect (slow, debugging only)
 
 # Audio device indices
 AUDIO_DEVICES = {
@@ -31,16 +56,68 @@ AUDIO_DEVICES = {
     
 }
 
-defaultDirectory = "C:\\Users\\henry\\OneDrive\\Documents\\TappieV2\\TappieV2\\PCApp"
+# Resolve all asset paths once, relative to this script, so the app works
+# from any checkout location
+_ASSETS = pathlib.Path(__file__).resolve().parent
 
 AUDIO_DEVICE_ICONS = {
-    "Master": defaultDirectory + "\\icons\\tappieIcon.ico",
-    "Gaming": defaultDirectory + "\\icons\\gamingIcon.ico",
-    "Aux": defaultDirectory + "\\icons\\auxIcon.ico",
-    "Media": defaultDirectory + "\\icons\\mediaIcon.ico",
-    "Chat": defaultDirectory + "\\icons\\chatIcon.ico",
+    "Master": str(_ASSETS / "icons" / "tappieIcon.ico"),
+    "Gaming": str(_ASSETS / "icons" / "gamingIcon.ico"),
+    "Aux": str(_ASSETS / "icons" / "auxIcon.ico"),
+    "Media": str(_ASSETS / "icons" / "mediaIcon.ico"),
+    "Chat": str(_ASSETS / "icons" / "chatIcon.ico"),
 }
 
+ICON_TAPPIE = AUDIO_DEVICE_ICONS["Master"]
+ICON_LOADING = str(_ASSETS / "icons" / "loadingIcon.ico")
+ICON_LOW_BATTERY = str(_ASSETS / "icons" / "lowBatteryIcon.ico")
+ICON_CRITICAL_BATTERY = str(_ASSETS / "icons" / "criticallyLowBatteryIcon.ico")
+
+LOW_BATTERY_MP3 = str(_ASSETS / "sounds" / "lowBatterySound.mp3")
+
+# WAV cues preloaded at startup and played from memory (see TappieController)
+SOUND_FILES = {
+    "pause": str(_ASSETS / "sounds" / "Pause.wav"),
+    "max": str(_ASSETS / "sounds" / "maxVolumeSound.wav"),
+    "min": str(_ASSETS / "sounds" / "minVolumeSound.wav"),
+    "mediaChange": str(_ASSETS / "sounds" / "mediaChange.wav"),
+    "criticalBattery": str(_ASSETS / "sounds" / "criticalLowBatterySound.wav"),
+    "connect": str(_ASSETS / "sounds" / "OnConnect.wav"),
+}
+
+# Flattened (name, device index, icon) triples so the hot loops iterate a tuple
+# instead of re-hashing the dicts on every pass
+_DEVICES = tuple((name, AUDIO_DEVICES[name], AUDIO_DEVICE_ICONS[name]) for name in AUDIO_DEVICES)
+_MASTER_IDX = AUDIO_DEVICES["Master"]
+
+AHK_EXECUTABLE = r"C:\Program Files\AutoHotkey\v1.1.36.02\AutoHotkeyU64.exe"
+SPOTIFY_LNK = r"C:\Users\henry\AppData\Roaming\Microsoft\Windows\Start Menu\Programs\Spotify.lnk"
+
+# One AHK instance for the whole app. The ahk package keeps a single long-lived
+# AutoHotkey process behind each instance and pipelines commands over its stdio,
+# so sharing this amortizes the process launch over the session instead of
+# paying it per sound_get/sound_set/menu_tray_* call.
+ahk = AHK(executable_path=AHK_EXECUTABLE, version="v1")
+
+# AHK snippet returning "mute,volume" for one device in a single round-trip
+# (sound_get would need two)
+_AHK_GET_MUTE_VOL = """
+SoundGet, mute, MASTER, MUTE, {idx}
+SoundGet, vol, MASTER, VOLUME, {idx}
+FileAppend, %mute%`,%vol%, *
+"""
+
+# Tooltip line templates for the four (selected, muted) states
+TOOLTIP_SEL_MUTED = "→ %s is muted"
+TOOLTIP_MUTED = "%s is muted"
+TOOLTIP_SEL_VOLUME = "→ %s: %d%%"
+TOOLTIP_VOLUME = "%s: %d%%"
+TOOLTIP_BATTERY = "Battery level: %d%%"
+
+# Hot-path diagnostics go through this logger (lazy %-formatting, WARNING by
+# default) so a fast encoder spin doesn't pay stdout syscalls per tick
+log = logging.getLogger("tappie")
+
 
 
 class TappieController:
@@ -49,72 +126,216 @@ class TappieController:
 
     def __init__(self):
         # Initialize the controller
-        self.ahk = AHK(executable_path=r"C:\Program Files\AutoHotkey\v1.1.36.02\AutoHotkeyU64.exe")
-        self.ahk.menu_tray_icon(defaultDirectory + "\\icons\\tappieIcon.ico")
+        self.ahk = ahk  # Shared persistent AHK channel (see module scope)
+        # Single worker thread that serializes all AHK access so the BLE event
+        # loop never blocks on an AHK round-trip
+        self._ahk_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._last_icon = None  # Last icon pushed to the tray, to skip no-op writes
+        self._set_tray_icon(ICON_TAPPIE)
         self.ahk.menu_tray_tooltip("Tappie V2")
         self.selected_device = "Master"
+        self._current_device_index = _MASTER_IDX  # Tracks selected_device
+        # Last-known volume/mute per device so the tooltip doesn't need AHK round-trips
+        self._sound_state = {name: {"vol": None, "mute": None} for name in AUDIO_DEVICES}
         self.prev_enc_position = 0
-        self.reset_timer = None
+        self._loop = None  # Set via attach_loop once the event loop is running
+        self._pending_delta = 0   # Encoder steps accumulated since the last flush
+        self._flush_handle = None
+        self.reset_timer = None       # Handle of the chained reset watcher
+        self._reset_deadline = None   # loop.time() after which we fall back to Master
         self.last_volume_change = time.time()
         self.previousBatteryLevel = None  # Add this line
+        self._ui_dirty = asyncio.Event()   # Tray UI needs a refresh
+        self._pending_battery = None       # Latest battery reading awaiting display
+        self._ui_task = None
+        self._last_tooltip = None  # Last tooltip pushed to AHK, to skip no-op writes
         self.notifiedBatteryLevel20 = False
         self.notifiedBatteryLevel10 = False
         self.notifiedBatteryLevel5 = False
-    
+        # O(1) dispatch on the raw payload instead of an if/elif chain
+        self._enc_btn_dispatch = {
+            BTN_SINGLE: self._on_single_click,
+            BTN_DOUBLE: self._on_double_click,
+            BTN_MULTI: self._on_multi_click,
+            BTN_LONG: self._on_long_press,
+        }
+        # Preload the WAV cues into memory so click feedback doesn't pay a
+        # file open (or an AHK round-trip) per play
+        self._sounds = {}
+        for name, path in SOUND_FILES.items():
+            try:
+                with open(path, "rb") as f:
+                    self._sounds[name] = f.read()
+            except OSError as e:
+                log.warning("Could not preload sound %s: %s", path, e)
+
+    def _set_tray_icon(self, icon):
+        #Set the tray icon, skipping the AHK call if it is already showing#
+        if icon != self._last_icon:
+            self.ahk.menu_tray_icon(icon)
+            self._last_icon = icon
+
+    def _set_status_tooltip(self, text):
+        #Push a status string to the tray, keeping the no-op cache in sync so
+        # the next device-list rebuild isn't mistaken for a duplicate#
+        self.ahk.menu_tray_tooltip(text)
+        self._last_tooltip = text
+
+    def notify_async(self, title, body="aaah get freaky"):
+        #Fire a toast on the event loop without blocking the calling thread#
+        asyncio.run_coroutine_threadsafe(
+            toast_async(title, body, audio={'silent': 'true'}), self._loop)
+
+    def play_sound(self, name):
+        #Queue a preloaded WAV cue without blocking the caller#
+        # winsound refuses SND_MEMORY together with SND_ASYNC, so memory
+        # playback has to be synchronous - run it on the AHK worker where a
+        # sub-second cue can't stall the event loop
+        self._ahk_executor.submit(self._play_sound_blocking, name)
+
+    def _play_sound_blocking(self, name):
+        #Worker-side playback of a preloaded cue#
+        try:
+            data = self._sounds.get(name)
+            if data is not None:
+                winsound.PlaySound(data, winsound.SND_MEMORY | winsound.SND_NODEFAULT)
+            else:
+                self.ahk.sound_play(SOUND_FILES[name])  # Fallback if preloading failed
+        except Exception as e:
+            log.warning("Could not play sound %s: %s", name, e)
+
+    def attach_loop(self, loop):
+        #Give the controller the running event loop and start the UI flusher#
+        self._loop = loop
+        self._ui_task = loop.create_task(self._ui_flusher())
+        self.reset_timer = loop.call_later(RESET_DELAY, self._check_reset)
+
+    def request_ui_update(self, batteryLevel=None):
+        #Mark the tray UI dirty; the flusher batches the actual AHK update#
+        if batteryLevel is not None:
+            self._pending_battery = batteryLevel
+        self._loop.call_soon_threadsafe(self._ui_dirty.set)
+
+    async def _ui_flusher(self):
+        #Coalesce tooltip/icon refreshes to at most one AHK update per window#
+        while True:
+            await self._ui_dirty.wait()
+            self._ui_dirty.clear()
+            battery = self._pending_battery
+            self._pending_battery = None
+            try:
+                await self._loop.run_in_executor(self._ahk_executor, self.updateToolTip, battery)
+            except Exception as e:
+                # A failed refresh must not kill the flusher - the next dirty
+                # event gets another go
+                log.error("Error updating tray UI: %s", e)
+            await asyncio.sleep(UI_FLUSH_DELAY)
+
     def schedule_reset(self):
-        #Schedule a reset to Master after RESET_DELAY seconds
-        if self.reset_timer:
-            self.reset_timer.cancel()
-        
-        self.reset_timer = threading.Timer(RESET_DELAY, self._reset_to_master)
-        self.reset_timer.daemon = True
-        self.reset_timer.start()
-    
+        #Start the inactivity window - a plain deadline store, no timer churn#
+        # (a single float write is atomic under the GIL, so this is safe from
+        # the worker thread; the watcher below does the actual firing)
+        self._reset_deadline = self._loop.time() + RESET_DELAY
+
+    def _cancel_reset(self):
+        #Clear any pending inactivity reset#
+        self._reset_deadline = None
+
+    def _check_reset(self):
+        #Single chained watcher on the loop; fires the reset when due#
+        deadline = self._reset_deadline
+        now = self._loop.time()
+        if deadline is None:
+            delay = RESET_DELAY
+        elif now >= deadline:
+            self._reset_deadline = None
+            if self.selected_device != "Master":
+                self._reset_to_master()
+            delay = RESET_DELAY
+        else:
+            delay = deadline - now
+        self.reset_timer = self._loop.call_later(delay, self._check_reset)
+
     def _reset_to_master(self):
-        #Reset selected device to Master#
+        #Reset selected device to Master (fires on the event loop)#
         self.selected_device = "Master"
-        self.updateToolTip(batteryLevel=None)  # Update tooltip without battery level
-        print("Inactivity detected - Reset to Master volume control")
-    
-    def roundToFive(self, x):
-        #Round a number to the nearest multiple of 5#
-        return round(x / 5) * 5
+        self._current_device_index = _MASTER_IDX
+        # Drop the cached Master state - after sitting idle the volume may have
+        # been changed behind our back, so re-read it on next use
+        self._sound_state["Master"]["vol"] = None
+        self._sound_state["Master"]["mute"] = None
+        self.request_ui_update()
+        log.debug("Inactivity detected - Reset to Master volume control")
     
+    @staticmethod
+    def _vol_to_int(volume):
+        #Parse an AHK volume string like "50.000000" into an int#
+        return int(float(volume))
+
+    def _get_mute_vol(self, device_number):
+        #Read mute and volume for a device with one AHK round-trip#
+        try:
+            result = self.ahk.run_script(_AHK_GET_MUTE_VOL.format(idx=device_number))
+            mute, volume = result.split(",", 1)
+            return mute.strip(), volume.strip()
+        except Exception as e:
+            # Fall back to the two-call path if the fused script misbehaves
+            log.warning("Fused sound_get failed for device %d: %s", device_number, e)
+            mute = self.ahk.sound_get(device_number=device_number, component_type="MASTER", control_type="MUTE")
+            volume = self.ahk.sound_get(device_number=device_number, component_type="MASTER", control_type="VOLUME")
+            return mute, volume
+
+    def _refresh_device(self, name):
+        #Re-read volume/mute for one device from AHK and store it in the cache#
+        mute, volume = self._get_mute_vol(AUDIO_DEVICES[name])
+        vol = self._vol_to_int(volume)
+        self._sound_state[name]["mute"] = (mute == "On")
+        # Align to the step grid on seed; write-throughs keep it aligned after
+        self._sound_state[name]["vol"] = (vol + VOLUME_STEP // 2) // VOLUME_STEP * VOLUME_STEP
+        return self._sound_state[name]
+
+    def _get_device_state(self, name):
+        #Return cached volume/mute for a device, reading from AHK on first use#
+        state = self._sound_state[name]
+        if state["vol"] is None or state["mute"] is None:
+            state = self._refresh_device(name)
+        return state
+
     def updateToolTip(self, batteryLevel):
         # Update the tooltip with the current battery level
-        if self.previousBatteryLevel is not None:
-            print(f"previousBatteryLevel: {self.previousBatteryLevel}%")
-        else:
-            print("previousBatteryLevel not set")
+        log.debug("previousBatteryLevel: %s", self.previousBatteryLevel)
             
-        toolTipString = ""
-        for audio_device in AUDIO_DEVICES:
-            if self.ahk.sound_get(device_number=AUDIO_DEVICES[audio_device], component_type="MASTER", control_type="MUTE") == "On":
-                if self.selected_device == audio_device:
-                    toolTipString += f"→ {audio_device} is muted\n"
-                else:
-                    toolTipString += f"{audio_device} is muted\n"
+        # Collect the lines and join once instead of reallocating with +=
+        parts = []
+        append = parts.append
+        for audio_device, _idx, _icon in _DEVICES:
+            state = self._get_device_state(audio_device)
+            selected = self.selected_device == audio_device
+            if state["mute"]:
+                append(TOOLTIP_SEL_MUTED % audio_device if selected else TOOLTIP_MUTED % audio_device)
             else:
-
-                volume = self.ahk.sound_get(device_number=AUDIO_DEVICES[audio_device], component_type='MASTER', control_type='VOLUME')
-                volume_int = int(float(volume))
-                if self.selected_device == audio_device:
-                    toolTipString += f"→ {audio_device}: {volume_int}%\n"
+                volume_int = state["vol"]
+                if selected:
+                    append(TOOLTIP_SEL_VOLUME % (audio_device, volume_int))
                 else:
-                    toolTipString += f"{audio_device}: {volume_int}%\n"
+                    append(TOOLTIP_VOLUME % (audio_device, volume_int))
         if batteryLevel is None:
             if self.previousBatteryLevel is not None:
-                toolTipString += f"Battery level: {self.previousBatteryLevel}%"
+                append(TOOLTIP_BATTERY % self.previousBatteryLevel)
             else:
-                toolTipString += "Battery level: N/A"
+                append("Battery level: N/A")
         else:
-            toolTipString += f"Battery level: {batteryLevel}%"
+            append(TOOLTIP_BATTERY % batteryLevel)
             self.previousBatteryLevel = batteryLevel  # Store in instance variable
-            print(f"Previous battery level: {self.previousBatteryLevel}%")
+            log.debug("Previous battery level: %s%%", self.previousBatteryLevel)
+        toolTipString = "\n".join(parts)
             
-        self.ahk.menu_tray_tooltip(toolTipString)
+        # Only talk to AHK when something actually changed
+        if toolTipString != self._last_tooltip:
+            self.ahk.menu_tray_tooltip(toolTipString)
+            self._last_tooltip = toolTipString
         if not self.notifiedBatteryLevel5:
-            self.ahk.menu_tray_icon(AUDIO_DEVICE_ICONS[self.selected_device])
+            self._set_tray_icon(AUDIO_DEVICE_ICONS[self.selected_device])
         
     
     def handleBatteryLevel(self, batteryLevel):
@@ -122,135 +343,153 @@ class TappieController:
         try:
             # Try to convert to integer
             batteryLevel = int(batteryLevel)
-            print(f"Battery level: {batteryLevel}%")
+            log.debug("Battery level: %d%%", batteryLevel)
 
             
             if batteryLevel <= 5:
                 if not self.notifiedBatteryLevel5:
                     self.notifiedBatteryLevel5 = True
-                    print("Battery critically low!")
-                    notify("Battery critically low!", "aaah get freaky", audio={'silent': 'true'})
-                    self.ahk.menu_tray_icon(defaultDirectory + "\\icons\\criticallyLowBatteryIcon.ico")
-                    self.ahk.sound_play(defaultDirectory + "\\sounds\\criticallyLowBatterySound.wav")
-                    threading.Timer(5, self.ahk.sound_play, args=[defaultDirectory + "\\sounds\\criticallyLowBatterySound.wav"]).start()
+                    log.debug("Battery critically low!")
+                    self.notify_async("Battery critically low!")
+                    self._set_tray_icon(ICON_CRITICAL_BATTERY)
+                    self.play_sound("criticalBattery")
+                    # Repeat the cue in 5 s via the loop instead of spawning a timer thread
+                    self._loop.call_soon_threadsafe(
+                        self._loop.call_later, 5, self.play_sound, "criticalBattery")
 
             elif batteryLevel <= 10:
                 if not self.notifiedBatteryLevel10:
                     self.notifiedBatteryLevel10 = True
-                    print("Battery lowkey critically low!")
-                    notify("Battery lowkey critically low!", "aaah get freaky", audio={'silent': 'true'})
-                    self.ahk.menu_tray_icon(defaultDirectory + "\\icons\\lowBatteryIcon.ico")
-                    self.ahk.sound_play(defaultDirectory + "\\sounds\\lowBatterySound.mp3")
+                    log.debug("Battery lowkey critically low!")
+                    self.notify_async("Battery lowkey critically low!")
+                    self._set_tray_icon(ICON_LOW_BATTERY)
+                    self.ahk.sound_play(LOW_BATTERY_MP3)
 
             # Handle low battery notification
             elif batteryLevel <= 20:
                 if not self.notifiedBatteryLevel20:
                     self.notifiedBatteryLevel20 = True
-                    print("Battery low!")
-                    notify("Battery low!", "aaah get freaky", audio={'silent': 'true'})
-                    self.ahk.menu_tray_icon(defaultDirectory + "\\icons\\lowBatteryIcon.ico")
-                    self.ahk.sound_play(defaultDirectory + "\\sounds\\lowBatterySound.mp3")
+                    log.debug("Battery low!")
+                    self.notify_async("Battery low!")
+                    self._set_tray_icon(ICON_LOW_BATTERY)
+                    self.ahk.sound_play(LOW_BATTERY_MP3)
 
             else:
                 # Reset icon if battery is okay
                 self.notifiedBatteryLevel20 = False
                 self.notifiedBatteryLevel10 = False
                 self.notifiedBatteryLevel5 = False
-                self.ahk.menu_tray_icon(AUDIO_DEVICE_ICONS[self.selected_device])
+                self._set_tray_icon(AUDIO_DEVICE_ICONS[self.selected_device])
         except ValueError:
-            print(f"Error: Invalid battery level format: {batteryLevel}")
+            log.error("Invalid battery level format: %s", batteryLevel)
         except Exception as e:
-            print(f"Error processing battery level: {e}")
+            log.error("Error processing battery level: %s", e)
 
-    def get_device_index(self, device_name):
-        #Get the device index for the currently selected device#
-        if device_name == None:
-            device_id = AUDIO_DEVICES.get(self.selected_device)
-        else:
-            device_id = AUDIO_DEVICES.get(device_name)
-        if device_id is None:
-            print(f"Invalid device selection: {self.selected_device}")
-            return AUDIO_DEVICES["Master"]
-        print(f"Selected device: {self.selected_device}")
-        return device_id
-    
     def adjust_volume(self, increase=True):
-        #Adjust volume up or down based on the parameter#
-        if self.reset_timer:
-            self.reset_timer.cancel()
-            self.reset_timer = None
-        device_index = self.get_device_index(None)
-        if self.ahk.sound_get(device_number=device_index, component_type="MASTER", control_type="MUTE") == "On":
-            print("Device is muted, cannot adjust volume")
-            return
-        else:
-            current_volume = self.ahk.sound_get(device_number=device_index, component_type="MASTER", control_type="VOLUME")
-            current_volume = int(float(current_volume))
-            current_volume = self.roundToFive(current_volume)
-            if increase:
-                new_volume = current_volume + VOLUME_STEP
-                operation = "increased"
-                if new_volume >= 100:
-                    self.ahk.sound_play(defaultDirectory + "\\sounds\\maxVolumeSound.wav")
+        #Queue a volume step - rapid encoder ticks are coalesced into one AHK write#
+        self._cancel_reset()
+        self._pending_delta += VOLUME_STEP if increase else -VOLUME_STEP
+        self._loop.call_soon_threadsafe(self._arm_flush)
+
+    def _arm_flush(self):
+        #Arm the flush timer on the event loop (no-op if one is already armed)#
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(VOLUME_FLUSH_DELAY, self._flush_due)
+
+    def _flush_due(self):
+        #Flush timer fired - run the AHK write on the AHK worker thread#
+        self._flush_handle = None
+        self._ahk_executor.submit(self._flush_volume)
+
+    def _flush_volume(self):
+        #Apply the accumulated encoder delta with a single sound_set#
+        # This runs on the AHK worker via a fire-and-forget submit whose
+        # Future nobody awaits, so errors have to be logged right here
+        try:
+            delta = self._pending_delta
+            self._pending_delta = 0
+            if delta == 0:
+                return
+            device_index = self._current_device_index
+            state = self._get_device_state(self.selected_device)
+            if state["mute"]:
+                log.debug("Device is muted, cannot adjust volume")
+                return
             else:
-                new_volume = current_volume - VOLUME_STEP
-                operation = "decreased"
-                if new_volume <= 0:
-                    self.ahk.sound_play(defaultDirectory + "\\sounds\\minVolumeSound.wav")
-            
-            # Ensure volume stays within valid range (0-100)
-            new_volume = max(0, min(100, new_volume))
-            print(new_volume)
-            
-            self.ahk.sound_set(new_volume, device_number=device_index, component_type="MASTER", control_type="VOLUME")
-            print(f"Volume {operation} to {new_volume} for device {device_index}")
-            self.updateToolTip(batteryLevel=None)  # Update tooltip without battery level
-            
-            # Update timestamp and schedule reset
-            self.last_volume_change = time.time()
-            self.schedule_reset()
+                # Cache values are seeded and written through already aligned
+                new_volume = state["vol"] + delta
+                operation = "increased" if delta > 0 else "decreased"
+                # Feedback only - isolated so a cue failure can't abort the
+                # flush and throw away the already-zeroed delta
+                try:
+                    if new_volume >= 100:
+                        self.play_sound("max")
+                    elif new_volume <= 0:
+                        self.play_sound("min")
+                except Exception as e:
+                    log.warning("Rail cue failed: %s", e)
+
+                # Ensure volume stays within valid range (0-100)
+                new_volume = max(0, min(100, new_volume))
+                if new_volume == state["vol"]:
+                    # Pinned at a rail (or a no-op delta) - skip the AHK write but
+                    # keep the inactivity logic ticking
+                    self.last_volume_change = time.time()
+                    self.schedule_reset()
+                    return
+
+                self.ahk.sound_set(new_volume, device_number=device_index, component_type="MASTER", control_type="VOLUME")
+                self._sound_state[self.selected_device]["vol"] = new_volume  # Write-through so the cache stays current
+                log.debug("Volume %s to %d for device %d", operation, new_volume, device_index)
+                self.request_ui_update()
+
+                # Update timestamp and schedule reset
+                self.last_volume_change = time.time()
+                self.schedule_reset()
+        except Exception as e:
+            log.error("Error adjusting volume: %s", e)
     
     def select_device(self, device_name):
         #Select a specific audio device by name#
         if device_name in AUDIO_DEVICES:
             if device_name != self.selected_device:
                 self.selected_device = device_name
-                self.updateToolTip(batteryLevel=None)  # Update tooltip without battery level
-                print(f"Selected device: {device_name}")
+                self._current_device_index = AUDIO_DEVICES[device_name]
+                self.request_ui_update()
+                log.debug("Selected device: %s", device_name)
                 if self.notifiedBatteryLevel5:
-                    self.ahk.menu_tray_icon(AUDIO_DEVICE_ICONS[device_name])
-                # Cancel any pending reset when a device is explicitly selected
-                if self.reset_timer:
-                    self.reset_timer.cancel()
-                    self.reset_timer = None
-                    self.last_volume_change = time.time()
-                    self.schedule_reset()
+                    self._set_tray_icon(AUDIO_DEVICE_ICONS[device_name])
+                # Restart the inactivity window now that a device was explicitly selected
+                self.last_volume_change = time.time()
+                self.schedule_reset()
         else:
-            print(f"Unknown device: {device_name}")
+            log.warning("Unknown device: %s", device_name)
     
     def handle_encoder_position(self, encData):
         # Handle encoder position changes with better error handling
         try:
-            # Split the combined string (format: "position batteryLevel")
-            parts = encData.split(" ", 1)  # Split only on first space
-            
+            # Split the combined payload (format: b"position batteryLevel") without decoding
+            parts = encData.split(b" ", 1)  # Split only on first space
+
             if len(parts) >= 2:
                 position = parts[0]
                 batteryLevel = parts[1]
                 # Process battery level
                 try:
                     self.handleBatteryLevel(batteryLevel)
-                    self.updateToolTip(batteryLevel)
+                    batteryLevel = int(batteryLevel)
+                    if batteryLevel != self.previousBatteryLevel:
+                        self.request_ui_update(batteryLevel)  # Only rebuild when the reading changed
                 except Exception as e:
-                    print(f"Error handling battery level: {e}")
+                    log.error("Error handling battery level: %s", e)
             else:
                 # If there's no battery level data, just use the position
                 position = parts[0]
-                print("Warning: No battery level data received")
-            
+                log.debug("No battery level data received")
+
             # Process position
-            if position == "reset":
-                print("Encoder position reset")
+            if position == ENC_RESET:
+                log.debug("Encoder position reset")
                 self.prev_enc_position = 0
                 return
             
@@ -258,52 +497,66 @@ class TappieController:
             try:
                 current_position = int(position)
                 if current_position > self.prev_enc_position:
-                    print(f"Encoder position increased: {position}")
+                    log.debug("Encoder position increased: %s", position)
                     self.adjust_volume(increase=True)
                 elif current_position < self.prev_enc_position:
-                    print(f"Encoder position decreased: {position}")
+                    log.debug("Encoder position decreased: %s", position)
                     self.adjust_volume(increase=False)
                 else:
-                    print(f"Encoder position unchanged: {position}")
+                    log.debug("Encoder position unchanged: %s", position)
                     
                 self.prev_enc_position = current_position
                 
             except ValueError:
-                print(f"Error: Could not convert position '{position}' to integer")
+                log.error("Could not convert position %r to integer", position)
                 
         except Exception as e:
-            print(f"Error processing encoder data '{encData}': {e}")
+            log.error("Error processing encoder data %r: %s", encData, e)
     
     def handle_encoder_button(self, button_action):
-        #Handle encoder button actions#
-        print(f"Received button action: {button_action}")
-        
-        if button_action == "single click":
-            self.ahk.key_press("Media_Play_Pause")
-            self.ahk.sound_play(defaultDirectory + "\\sounds\\Pause.wav")
-        elif button_action == "double click":
-            self.ahk.key_press("Media_Next")
-        elif button_action == "multi click":
-            self.ahk.key_press("Media_Prev")
-        elif button_action == "long press release":
-            self.ahk.run_script('Run "C:\\Users\\henry\\AppData\\Roaming\\Microsoft\\Windows\\Start Menu\\Programs\\Spotify.lnk"')
+        #Handle encoder button actions via the dispatch table#
+        log.debug("Received button action: %s", button_action)
+
+        action = self._enc_btn_dispatch.get(button_action)
+        if action:
+            action()
+
+    def _on_single_click(self):
+        self.ahk.key_press("Media_Play_Pause")
+        self.play_sound("pause")
+
+    def _on_double_click(self):
+        self.ahk.key_press("Media_Next")
+
+    def _on_multi_click(self):
+        self.ahk.key_press("Media_Prev")
+
+    def _on_long_press(self):
+        self.ahk.run_script(f'Run "{SPOTIFY_LNK}"')
     
     def handle_media_button(self, button_name):
         #Handle media button actions#
-        print(f"Received media button: {button_name}")
+        log.debug("Received media button: %s", button_name)
         
-        if button_name != "0":  # Ignore release notifications
-            self.select_device(button_name)
-            notify(f"Selected device: {button_name}", "aaah get freaky", audio={'silent': 'true'})
-            self.ahk.sound_play(defaultDirectory + "\\sounds\\mediaChange.wav")
+        if button_name != BTN_RELEASED:  # Ignore release notifications
+            device_name = button_name.decode()
+            self.select_device(device_name)
+            self.notify_async(f"Selected device: {device_name}")
+            self.play_sound("mediaChange")
         
     def handle_media_double_button(self, button_name):
         #Handle double media button actions#
-        print(f"Received double media button: {button_name}")
+        log.debug("Received double media button: %s", button_name)
         
-        if button_name != "0":
-            self.ahk.sound_set("+1", device_number=self.get_device_index(button_name), component_type="MASTER", control_type="MUTE")
-            self.updateToolTip(batteryLevel=None)  # Update tooltip without battery level
+        if button_name != BTN_RELEASED:
+            device_name = button_name.decode()
+            device_index = AUDIO_DEVICES.get(device_name)
+            if device_index is None:
+                log.warning("Unknown device: %s", device_name)
+                return
+            self.ahk.sound_set("+1", device_number=device_index, component_type="MASTER", control_type="MUTE")
+            self._refresh_device(device_name)  # Mute state changed, re-read it
+            self.request_ui_update()
 
 
     def cleanup(self):
@@ -311,6 +564,10 @@ class TappieController:
         if self.reset_timer:
             self.reset_timer.cancel()
             self.reset_timer = None
+        if self._ui_task:
+            self._ui_task.cancel()
+            self._ui_task = None
+        self._ahk_executor.shutdown(wait=False)
 
 
 class BLEClient:
@@ -319,57 +576,121 @@ class BLEClient:
     def __init__(self, controller):
         #Initialize with a controller instance#
         self.controller = controller
+        self._disc_evt = None  # Set when bleak reports the device disconnected
+        self._listed_devices = False  # Nearby-device dump already shown once
+        self._conn_params_request = None  # Keeps the WinRT parameter request alive
         
     async def find_device(self):
-        #Find the BLE device by name#
-        print(f"Scanning for {DEVICE_NAME}...")
-        device = await BleakScanner.find_device_by_name(DEVICE_NAME)
-        
+        #Find the BLE device by name, stopping the scan on its first advertisement#
+        log.info("Scanning for %s...", DEVICE_NAME)
+        found = {}
+        seen = asyncio.Event()
+
+        def on_detect(detected, _adv):
+            if detected.name == DEVICE_NAME:
+                found["device"] = detected
+                seen.set()
+
+        scanner = BleakScanner(detection_callback=on_detect)
+        await scanner.start()
+        try:
+            # Returns at the next advertising interval instead of scanning for
+            # the library's full default timeout
+            await asyncio.wait_for(seen.wait(), timeout=SCAN_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            await scanner.stop()
+
+        device = found.get("device")
         if not device:
-            print(f"Could not find {DEVICE_NAME}")
-            print("Available devices:")
-            devices = await BleakScanner.discover()
-            for d in devices:
-                print(f"  {d.name}: {d.address}")
+            log.warning("Could not find %s", DEVICE_NAME)
+            if not self._listed_devices:
+                # Diagnostic scan of everything nearby, but only on the first
+                # failure - repeating it doubled every retry cycle
+                self._listed_devices = True
+                log.info("Available devices:")
+                devices = await BleakScanner.discover()
+                for d in devices:
+                    log.info("  %s: %s", d.name, d.address)
             return None
         
-        print(f"Found {device.name} ({device.address})")
+        log.info("Found %s (%s)", device.name, device.address)
         return device
     
+    def _request_low_latency(self, client):
+        #Best-effort request for a short BLE connection interval#
+        # Every encoder tick rides the negotiated connection interval, so ask
+        # Windows for the throughput-optimized parameter set. Needs a recent
+        # Windows/winrt and the firmware to accept the interval; harmless no-op
+        # otherwise.
+        if platform.system() != "Windows":
+            return
+        try:
+            from winrt.windows.devices.bluetooth import (
+                BluetoothLEPreferredConnectionParameters,
+            )
+            requester = client._backend._requester
+            # Windows only honors the preference while the returned request
+            # object is alive, so hold it until the connection ends
+            self._conn_params_request = requester.request_preferred_connection_parameters(
+                BluetoothLEPreferredConnectionParameters.throughput_optimized)
+            log.debug("Requested low-latency connection parameters")
+        except Exception as e:
+            log.debug("Could not request connection parameters: %s", e)
+
     async def connect_with_retry(self):
         #Connect to the device with retry mechanism#
         while True:
             device = await self.find_device()
             if not device:
-                print(f"Retrying in {RECONNECT_DELAY} seconds...")
+                log.info("Retrying in %d seconds...", RECONNECT_DELAY)
                 await asyncio.sleep(RECONNECT_DELAY)
                 continue
             
             try:
-                client = BleakClient(device, winrt=dict(use_cached_services=False))
+                # Bind the callback to this connection's event so a late
+                # callback from a previous client can't trip the new one
+                self._disc_evt = disc_evt = asyncio.Event()
+                client = BleakClient(
+                    device,
+                    disconnected_callback=lambda c: disc_evt.set(),
+                    winrt=dict(use_cached_services=False),
+                )
                 await client.connect()
-                print(f"Connected: {client.is_connected}")
-                self.controller.ahk.menu_tray_tooltip("Connected to Tappie V2")
+                self._request_low_latency(client)
+                log.info("Connected: %s", client.is_connected)
+                # All AHK access goes through the single worker so the loop
+                # never blocks and calls can't interleave
+                self.controller._ahk_executor.submit(self.controller._set_status_tooltip, "Connected to Tappie V2")
                 #notify("Connection Established with Tappie V2", "aaah get freaky", audio={'silent': 'true'}, duration=0.5)
                 return client
             except BleakError as e:
-                print(f"Connection error: {e}")
-                print(f"Retrying in {RECONNECT_DELAY} seconds...")
+                log.error("Connection error: %s", e)
+                log.info("Retrying in %d seconds...", RECONNECT_DELAY)
                 await asyncio.sleep(RECONNECT_DELAY)
     
     def setup_notification_handlers(self, client):
         #Set up notification handlers for the client#
-        async def enc_pos_handler(_, data):
-            self.controller.handle_encoder_position(data.decode())
-            
-        async def enc_button_handler(_, data):
-            self.controller.handle_encoder_button(data.decode())
-            
-        async def media_button_handler(_, data):
-            self.controller.handle_media_button(data.decode())
+        # Plain callbacks: bleak invokes these directly instead of scheduling a
+        # Task per notification, and submitting to the single AHK worker keeps
+        # the blocking work off the loop without awaiting it
+        submit = self.controller._ahk_executor.submit
+        controller = self.controller
+
+        def enc_pos_handler(_, data):
+            # Highest-frequency characteristic: pass the bytearray through
+            # uncopied; split/int/compares all take it directly
+            submit(controller.handle_encoder_position, data)
+
+        def enc_button_handler(_, data):
+            submit(controller.handle_encoder_button, bytes(data))
 
-        async def media_double_button_handler(_, data):
-            self.controller.handle_media_double_button(data.decode())
+        def media_button_handler(_, data):
+            submit(controller.handle_media_button, bytes(data))
+
+        def media_double_button_handler(_, data):
+            submit(controller.handle_media_double_button, bytes(data))
             
             
         return {
@@ -379,61 +700,85 @@ class BLEClient:
             MEDIA_DOUBLEBUTTON_UUID: media_double_button_handler
         }
     
+    async def _start_notify_with_retry(self, client, uuid, handler):
+        #Start one notification, retrying with backoff if it fails#
+        for attempt in range(3):
+            try:
+                log.debug("Starting notification for %s...", uuid)
+                await client.start_notify(uuid, handler)
+                log.debug("Successfully started notification for %s", uuid)
+                return
+            except Exception as e:
+                log.warning("Error starting notification for %s (attempt %d): %s", uuid, attempt + 1, e)
+                await asyncio.sleep(0.1 * (1 << attempt))
+
     async def run_client(self, client):
         #Run the client once connected#
         handlers = self.setup_notification_handlers(client)
         try:
-            # Get services with detailed property information
-            services = await client.get_services()
-            for service in services:
-                print(f"Service: {service.uuid}")
-                for char in service.characteristics:
-                    print(f"  Characteristic: {char.uuid}")
-                    print(f"    Properties: {char.properties}")
-                    print(f"    Has Notify: {'Notify' in char.properties}")
-        except Exception as e:
-            print(f"Error getting services: {e}")
-            # Start notifications with better error handling and delays
-            for uuid, handler in handlers.items():
+            if DEBUG_GATT:
+                # Dump services with detailed property information (debug only).
+                # client.services is populated during connect(), so this costs
+                # no extra GATT round-trip (get_services() is also deprecated)
                 try:
-                    print(f"Starting notification for {uuid}...")
-                    await client.start_notify(uuid, handler)
-                    print(f"Successfully started notification for {uuid}")
-                    # Add a small delay between starting each notification to prevent BLE stack issues
-                    await asyncio.sleep(0.5)
+                    services = client.services
+                    for service in services:
+                        log.info("Service: %s", service.uuid)
+                        for char in service.characteristics:
+                            log.info("  Characteristic: %s", char.uuid)
+                            log.info("    Properties: %s", char.properties)
+                            log.info("    Has Notify: %s", "Notify" in char.properties)
                 except Exception as e:
-                    print(f"Error starting notification for {uuid}: {e}")
-                    continue
+                    log.error("Error getting services: %s", e)
+
+            # Subscribe all characteristics concurrently - the descriptor
+            # writes overlap into roughly one connection interval instead of
+            # paying a round-trip each
+            await asyncio.gather(
+                *(self._start_notify_with_retry(client, uuid, handler)
+                  for uuid, handler in handlers.items()))
         
-            print("Listening for notifications, press Ctrl+C to stop...")
+            log.info("Listening for notifications, press Ctrl+C to stop...")
             
             #notify("Ready to talk to Tappie V2", "aaah get freaky", audio={'silent': 'true'})
-            self.controller.ahk.menu_tray_tooltip("Ready to talk to Tappie V2")
-            self.controller.ahk.menu_tray_icon(defaultDirectory + "\\icons\\tappieIcon.ico")
-            self.controller.updateToolTip(batteryLevel=None)  # Update tooltip without battery level
+            # Connect feedback without stalling the loop: the preloaded cue
+            # plays on the AHK worker alongside the tray updates, so
+            # notifications can be handled immediately. Feedback is cosmetic -
+            # it must never bubble into the except below and tear the
+            # session down
+            try:
+                self.controller.play_sound("connect")
+                self.controller._ahk_executor.submit(self.controller._set_status_tooltip, "Ready to talk to Tappie V2")
+                self.controller._ahk_executor.submit(self.controller._set_tray_icon, ICON_TAPPIE)
+                self.controller.request_ui_update()
+            except Exception as e:
+                log.warning("Connect feedback failed: %s", e)
             
-            # Keep checking connection
-            while True:
-                if not client.is_connected:
-                    print("Disconnected! Attempting to reconnect...")
-                    notify("Disconnected from Tappie V2", "aaah get freaky")
-                    self.controller.ahk.menu_tray_tooltip("Disconnected from Tappie V2")
-                    self.controller.ahk.menu_tray_icon(defaultDirectory + "\\icons\\loadingIcon.ico")
-                    break
-                await asyncio.sleep(0.5)
-                
+            # Sleep until bleak's disconnected_callback fires - no polling
+            await self._disc_evt.wait()
+            log.warning("Disconnected! Attempting to reconnect...")
+            # notify_async holds its own reference to the coroutine, so the
+            # toast can't be garbage-collected mid-flight like a bare
+            # create_task could be
+            self.controller.notify_async("Disconnected from Tappie V2")
+            self.controller._ahk_executor.submit(self.controller._set_status_tooltip, "Disconnected from Tappie V2")
+            self.controller._ahk_executor.submit(self.controller._set_tray_icon, ICON_LOADING)
+
+
         except Exception as e:
-            print(f"Error during client operation: {e}")
+            log.error("Error during client operation: %s", e)
         finally:
             # Clean up
+            self._conn_params_request = None  # Preference dies with the connection
             if client.is_connected:
                 try:
-                    for uuid in handlers.keys():
-                        await client.stop_notify(uuid)
-                    print("Notifications stopped")
+                    await asyncio.gather(
+                        *(client.stop_notify(uuid) for uuid in handlers),
+                        return_exceptions=True)
+                    log.debug("Notifications stopped")
                     await client.disconnect()
                 except Exception as e:
-                    print(f"Error during disconnect: {e}")
+                    log.error("Error during disconnect: %s", e)
     
     async def main_loop(self):
         #Main loop with connection management and reconnection logic#
@@ -446,20 +791,21 @@ class BLEClient:
                 await self.run_client(client)
                 
                 # If we get here, connection was lost
-                print(f"Reconnecting in {RECONNECT_DELAY} seconds...")
+                log.info("Reconnecting in %d seconds...", RECONNECT_DELAY)
                 await asyncio.sleep(RECONNECT_DELAY)
                 
         except asyncio.CancelledError:
-            print("Task was cancelled")
+            log.info("Task was cancelled")
         except KeyboardInterrupt:
-            print("Script terminated by user")
+            log.info("Script terminated by user")
 
 
 async def main():
     #Application entry point#
     controller = TappieController()
+    controller.attach_loop(asyncio.get_running_loop())
     client = BLEClient(controller)
-    
+
     try:
         await client.main_loop()
     finally:
@@ -467,7 +813,8 @@ async def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        print("Script terminated by user")
\ No newline at end of file
+        log.info("Script terminated by user")
\ No newline at end of file